@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import abstractmethod
 from collections.abc import Callable
+from functools import lru_cache
 import re
 from typing import Literal, TypedDict
 from contui.buffer import Buffer, Pixel
@@ -82,12 +83,12 @@ def default_properties(origin: OptionalProperties | dict) -> Properties:
 class Node:
     style: Properties
 
-    def __init__(self, *, style: OptionalProperties | None = None):
+    def __init__(self, *, style: OptionalProperties | None = None, buffer: Buffer | None = None):
         self.buffer = buffer
         self.style = default_properties(style or {})
 
     @abstractmethod
-    def render(self):
+    def render(self, rect: Rect, buffer: Buffer | None):
         return NotImplementedError
 
 class Rect:
@@ -121,60 +122,118 @@ class Rect:
         """Applies padding to the rect.
 
         Returns
-            A copy of the current rect with the padding applied.
+            A copy of the current rect with the padding applied. The rect itself is
+            returned when there is no padding.
         """
-        padding = normalize_position(padding)
+        if padding == 0:
+            return self
+        elif type(padding) is int:
+            top = right = bottom = left = padding
+        else:
+            (top, right, bottom, left) = normalize_position(padding)
+            if top == right == bottom == left == 0:
+                return self
 
         rect = Rect(self.left, self.top, self.width, self.height)
-        rect.left += calc(padding[3], self.width)
-        rect.right -= calc(padding[1], self.width)
-        rect.top += calc(padding[0], self.height)
-        rect.bottom -= calc(padding[2], self.height)
+        rect.left += calc(left, self.width)
+        rect.right -= calc(right, self.width)
+        rect.top += calc(top, self.height)
+        rect.bottom -= calc(bottom, self.height)
         return rect
 
 ANSI = re.compile(r"\x1b\[[\d;]+m")
+SGR_PARAMS = "0123456789;"
 
-class RichText(Node):
-    def __init__(self, text: str="", *, style: OptionalProperties | None = None):
-        super().__init__(style=style)
-        self.text = Markup.parse(text, mar=False)
+@lru_cache(maxsize=256)
+def _parse_markup(text: tuple[str, ...], sep: str = ' ') -> str:
+    """Parse markup into ansi sequences. Repeated writes of the same markup are parsed once."""
+    return Markup.parse(*text, sep=sep, mar=False)
+
+class TextNode(Node):
+    """A node whose text is built up from written segments.
+
+    Segments are only joined when the text is read, so streaming many writes
+    into a node stays linear.
+    """
+
+    def __init__(self, *, style: OptionalProperties | None = None, buffer: Buffer | None = None):
+        super().__init__(style=style, buffer=buffer)
+        self._segments: list[str] = []
+
+    @property
+    def text(self) -> str:
+        if len(self._segments) > 1:
+            self._segments = ["".join(self._segments)]
+        return self._segments[0] if len(self._segments) > 0 else ""
+
+    @text.setter
+    def text(self, text: str):
+        self._segments = [text]
+
+class RichText(TextNode):
+    def __init__(
+        self,
+        text: str = "",
+        *,
+        style: OptionalProperties | None = None,
+        buffer: Buffer | None = None,
+    ):
+        super().__init__(style=style, buffer=buffer)
+        self.text = _parse_markup((text,))
 
     def write(self, *text: str, sep: str = ' '):
-        self.text += Markup.parse(*text, sep=sep, mar=False)
+        if len(text) == 1 and "[" not in text[0] and "\\" not in text[0]:
+            # Plain text without any markup or escapes
+            self._segments.append(text[0])
+            return
+        self._segments.append(_parse_markup(text, sep))
 
-    def render(self, rect: Rect, buffer: Buffer):
+    def render(self, rect: Rect, buffer: Buffer | None = None):
         """Calculate and render the pixels that are to be drawn into the buffer.
 
         # Args
             rect (Rect): The writable area in the buffer this node can use.
+            buffer (Buffer | None): The buffer to draw into. Defaults to the node's buffer.
         """
-        if self.buffer is None:
+        if buffer is None:
+            buffer = self.buffer
+        if buffer is None:
             return
 
         rect = rect.padded(self.style['padding'])
 
         _style = Style()
-        pixels = []
-        previous = 0
-        for ansi in ANSI.finditer(self.text):
-            if ansi.start() > previous:
-                # add all chars with previous style
-                pixels.extend(
-                    Pixel(c, _style) for c in self.text[previous : ansi.start()]
-                )
-            _style = Style.from_ansi(ansi.group(0))
-            previous = ansi.start() + len(ansi.group(0))
-        if previous < len(self.text):
-            pixels.extend(Pixel(c, _style) for c in self.text[previous:])
+        # Split into lines first so the pixels never need a second pass for newlines
+        text_lines = self.text.split("\n")
 
         lines: list[list[Pixel]] = []
-        previous = 0
-        for i in range(len(pixels)):
-            if pixels[i].symbol == "\n":
-                lines.append(pixels[previous:i])
-                previous = i + 1
-        if previous < len(pixels):
-            lines.append(pixels[previous:])
+        if "\x1b" not in self.text:
+            # No escape sequences so every pixel shares the default style
+            lines = [[Pixel(c, _style) for c in line] for line in text_lines]
+        else:
+            # Scan for `\x1b[<params>m` with str.find instead of the ANSI regex
+            for text in text_lines:
+                pixels = []
+                previous = 0
+                start = text.find("\x1b[")
+                while start != -1:
+                    end = text.find("m", start + 2)
+                    if end == -1:
+                        break
+                    params = text[start + 2 : end]
+                    if params and not params.strip(SGR_PARAMS):
+                        pixels += [Pixel(c, _style) for c in text[previous:start]]
+                        _style = Style.from_ansi(text[start : end + 1])
+                        previous = end + 1
+                        start = text.find("\x1b[", previous)
+                    else:
+                        start = text.find("\x1b[", start + 1)
+                pixels += [Pixel(c, _style) for c in text[previous:]]
+                lines.append(pixels)
+
+        # A trailing line without any pixels, even if it held escape sequences, isn't drawn
+        if len(lines) > 0 and len(lines[-1]) == 0:
+            lines.pop()
 
         for row, line in zip(
             buffer[rect.top + align(lines, self.style['align_items'], rect.height): rect.bottom],
@@ -186,25 +245,35 @@ class RichText(Node):
             ):
                 pixel.set(char.symbol, char.style) 
 
-class Text(Node):
-    def __init__(self, text: str="", *, style: OptionalProperties | None = None):
-        super().__init__(style=style)
+class Text(TextNode):
+    def __init__(
+        self,
+        text: str = "",
+        *,
+        style: OptionalProperties | None = None,
+        buffer: Buffer | None = None,
+    ):
+        super().__init__(style=style, buffer=buffer)
         self.text = text
 
     def write(self, *text: str, sep: str = ' '):
-        self.text += sep.join(text)
+        self._segments.append(sep.join(text))
 
-    def render(self, rect: Rect, buffer: Buffer):
+    def render(self, rect: Rect, buffer: Buffer | None = None):
         """Calculate and render the pixels that are to be drawn into the buffer.
 
         # Args
             rect (Rect): The writable area in the buffer this node can use.
+            buffer (Buffer | None): The buffer to draw into. Defaults to the node's buffer.
         """
-        if self.buffer is None:
+        if buffer is None:
+            buffer = self.buffer
+        if buffer is None:
             return
 
         rect = rect.padded(self.style['padding'])
-        pixels: list[list[str]] = [[char for char in line] for line in self.text.strip().split("\n")]
+        # Strings zip by character so each line never needs to become a list
+        pixels: list[str] = self.text.strip().split("\n")
 
         for row, line in zip(
             buffer[rect.top + align(pixels, self.style['align_items'], rect.height): rect.bottom],
@@ -216,7 +285,7 @@ class Text(Node):
             ):
                 pixel.set(char, Style()) 
 
-def align(origin: list, alignment: Align, total: int) -> int:
+def align(origin: list | str, alignment: Align, total: int) -> int:
     if alignment == "center":
         remainder = (total - len(origin))
         return  remainder // 2 if remainder > 0 else 0
@@ -237,7 +306,9 @@ def calc(val: int | float | Callable[[int], int], total: int) -> int:
     If the value is a Percent (float) then the max width is multiplied by the value. Finally, if the
     value is a callable then the max value is passed in and the resulting int is returned.
     """
-    if callable(val):
+    if type(val) is int:
+        return val
+    elif callable(val):
         return val(total)
     elif isinstance(val, float):
         return round(total * val)
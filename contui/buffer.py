@@ -1,31 +1,76 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from functools import lru_cache
+from itertools import chain, repeat
 from sys import stdout
 from os import get_terminal_size
-from typing import Generator, overload
+from typing import Generator, Iterable, overload
+from unicodedata import combining, east_asian_width
 
 from contui.style import Style
 
 __all__ = ["Buffer"]
 
+# Styles are never mutated once built so every default pixel can share one
+_DEFAULT_STYLE = Style()
+
+@lru_cache(maxsize=4096)
+def _is_narrow(symbol: str) -> bool:
+    """Whether the symbol moves the cursor exactly one column. Empty, wide, and combining
+    symbols don't, so the pixel after them needs its own cursor move.
+    """
+    return (
+        len(symbol) == 1
+        and east_asian_width(symbol) not in ("W", "F")
+        and combining(symbol) == 0
+    )
+
 def _write(content: str):
     stdout.write(content)
     stdout.flush()
 
+def _write_chunks(chunks: Iterable[bytes]):
+    """Write encoded chunks straight into stdout's byte buffer without joining them first."""
+    out = getattr(stdout, "buffer", None)
+    if out is None:
+        _write(b"".join(chunks).decode("utf-8"))
+        return
+
+    stdout.flush()
+    for chunk in chunks:
+        out.write(chunk)
+    out.flush()
+
 class Pixel:
-    """A unicode symbol and it's ansi sequence styling."""
+    """A unicode symbol and it's ansi sequence styling.
+
+    The style is shared by reference, it is rebound and never mutated. Pixels owned by a
+    buffer report their position to the buffer's damage set whenever they change.
+    """
 
-    __slots__ = ("symbol", "style")
+    __slots__ = ("symbol", "style", "_utf8", "_narrow", "_damage", "_at")
 
     def __init__(self, symbol: str, style: Style):
         self.symbol = symbol
-        self.style = deepcopy(style)
+        self.style = style
+        # Encoded once per change instead of once per frame
+        self._utf8 = symbol.encode()
+        self._narrow = _is_narrow(symbol)
+        self._damage: set[tuple[int, int]] | None = None
+        self._at = (0, 0)
 
     def set(self, symbol: str, style: Style | None = None):
-        self.symbol = symbol
-        if style is not None:
+        changed = False
+        if symbol != self.symbol:
+            self.symbol = symbol
+            self._utf8 = symbol.encode()
+            self._narrow = _is_narrow(symbol)
+            changed = True
+        if style is not None and style is not self.style:
             self.style = style
+            changed = True
+        if changed and self._damage is not None:
+            self._damage.add(self._at)
 
     def __eq__(self, __value: object) -> bool:
         if isinstance(__value, Pixel):
@@ -33,12 +78,40 @@ class Pixel:
         return False
 
     def __repr__(self) -> str:
-        return repr(f"{self.style}{self.symbol}\x1b[0m")
+        return repr(str(self))
 
     def __str__(self) -> str:
         return f"{self.style}{self.symbol}\x1b[0m"
 
 
+class _Row(list):
+    """A row of pixels. Pixels assigned into the row report to the buffer's damage set like
+    pixels changed through `Pixel.set`.
+    """
+
+    __slots__ = ("_index", "_damage")
+
+    def __init__(self, pixels: Iterable[Pixel], index: int, damage: set[tuple[int, int]] | None):
+        super().__init__(pixels)
+        self._index = index
+        self._damage = damage
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if isinstance(key, slice):
+            # A slice can change the length of the row, so every pixel's column is rebound
+            columns = range(len(self))
+        else:
+            columns = (key + len(self) if key < 0 else key,)
+
+        for j in columns:
+            pixel = self[j]
+            pixel._damage = self._damage
+            pixel._at = (self._index, j)
+            if self._damage is not None:
+                self._damage.add(pixel._at)
+
+
 class Buffer:
     """A terminal buffer that overwrites to a rect of the terminal.
 
@@ -48,7 +121,17 @@ class Buffer:
         default (str): The char to use for each pixel by default. Defaults to `''` (empty str)
     """
 
-    __slots__ = ("__BUFFER__", "__CACHE__", "_width_", "_height_", "_default_")
+    __slots__ = (
+        "__BUFFER__",
+        "__CACHE__",
+        "__CACHE_STYLES__",
+        "_width_",
+        "_height_",
+        "_default_",
+        "_damage",
+        "_cup_rows_",
+        "_cup_cols_",
+    )
 
     def __init__(
         self, width: int | None = None, height: int | None = None, default: str = " "
@@ -59,11 +142,15 @@ class Buffer:
         self._height_ = height or lines
         self._default_ = default
 
+        # Positions of the pixels changed since the last cache, `None` when untracked
+        self._damage: set[tuple[int, int]] | None = set()
         self.__BUFFER__: list[list[Pixel]] = [
-            [Pixel(default, Style()) for _ in range(self._width_)]
-            for _ in range(self._height_)
+            _Row(self._blank_(i, 0, self._width_), i, self._damage) for i in range(self._height_)
         ]
-        self.__CACHE__ = []
+        self._cursor_table_()
+        # Flat row major planes of the cached symbols and styles
+        self.__CACHE__: list[str] = []
+        self.__CACHE_STYLES__: list[Style] = []
 
     @property
     def width(self) -> int:
@@ -89,35 +176,77 @@ class Buffer:
 
         if height > self._height_:
             self.__BUFFER__.extend(
-                [
-                    [Pixel(self._default_, Style()) for _ in range(self._width_)]
-                    for _ in range(height - self._height_)
-                ]
+                _Row(self._blank_(i, 0, self._width_), i, self._damage)
+                for i in range(self._height_, height)
             )
         elif height < self._height_:
-            self.__BUFFER__ = self.__BUFFER__[:height]
+            del self.__BUFFER__[height:]
 
         if width > self._width_:
-            for row in range(len(self.__BUFFER__)):
-                self.__BUFFER__[row].extend(
-                    [Pixel(self._default_, Style()) for _ in range(self._width_)]
-                )
+            for i, row in enumerate(self.__BUFFER__):
+                row.extend(self._blank_(i, self._width_, width - self._width_))
         elif width < self._width_:
-            for row in range(len(self.__BUFFER__)):
-                self.__BUFFER__[row] = self.__BUFFER__[row][:width]
+            for row in self.__BUFFER__:
+                del row[width:]
 
         self._width_ = width
         self._height_ = height
+        self._cursor_table_()
+
+    def _cursor_table_(self):
+        """Precompute the encoded halves of the cursor position sequence, `\\x1b[{row};`
+        and `{col}H`, for every row and column of the buffer.
+        """
+        self._cup_rows_ = [f"\x1b[{i+1};".encode() for i in range(self._height_)]
+        self._cup_cols_ = [f"{j+1}H".encode() for j in range(self._width_)]
+
+    def _blank_(self, row: int, start: int, width: int) -> list[Pixel]:
+        """New default pixels for a row, tracked from the `start` column onward."""
+        pixels = list(map(Pixel, repeat(self._default_, width), repeat(_DEFAULT_STYLE, width)))
+        for j, pixel in enumerate(pixels, start):
+            pixel._damage = self._damage
+            pixel._at = (row, j)
+        return pixels
+
+    def _damaged_(self) -> dict[int, list[int]]:
+        """Damaged columns grouped by row. Positions outside of the buffer are ignored."""
+        rows: dict[int, list[int]] = {}
+        for i, j in self._damage or ():
+            if i < len(self.__BUFFER__) and j < len(self.__BUFFER__[i]):
+                rows.setdefault(i, []).append(j)
+        return rows
 
     def clear(self):
         """Clears the screen, cache, and buffer."""
         self.__CACHE__.clear()
+        self.__CACHE_STYLES__.clear()
         self.__reset__()
         _write("\x1b[2J")
 
     def cache(self):
         """Cache the current buffer state."""
-        self.__CACHE__ = deepcopy(self.__BUFFER__)
+        width = self._width_
+        if self._damage is not None and not self._stale_():
+            # Only the damaged pixels can differ from the cache
+            symbols, styles = self.__CACHE__, self.__CACHE_STYLES__
+            for i, columns in self._damaged_().items():
+                row = self.__BUFFER__[i]
+                for j in columns:
+                    symbols[i * width + j] = row[j].symbol
+                    styles[i * width + j] = row[j].style
+        else:
+            self.__CACHE__ = [p.symbol for row in self.__BUFFER__ for p in row]
+            self.__CACHE_STYLES__ = [p.style for row in self.__BUFFER__ for p in row]
+
+        if self._damage is not None:
+            self._damage.clear()
+
+    def _stale_(self) -> bool:
+        """Whether the cache no longer matches the shape of the buffer."""
+        return (
+            len(self.__CACHE__) == 0
+            or len(self.__CACHE__) != self._width_ * len(self.__BUFFER__)
+        )
 
     def render(self) -> str:
         """Calculate what pixels should be drawn. Only the changed pixels are rendered.
@@ -125,24 +254,86 @@ class Buffer:
         Returns
             The ansi sequences and characters in a single string to render the entire buffer.
         """
+        return b"".join(self._render_chunks_()).decode("utf-8")
+
+    def _render_chunks_(self) -> Generator[bytearray, None, None]:
+        """Yield the encoded output of each changed row."""
+        width = self._width_
+        symbols, styles = self.__CACHE__, self.__CACHE_STYLES__
+        if self._stale_():
+            for i, pixels in enumerate(self.__BUFFER__):
+                yield self._render_runs_(i, pixels, range(len(pixels)))
+        elif self._damage is None:
+            # Untracked (sub) buffers diff each row of the planes against the cache
+            for i, pixels in enumerate(self.__BUFFER__):
+                start = i * width
+                if (
+                    [p.symbol for p in pixels] != symbols[start : start + width]
+                    or [p.style for p in pixels] != styles[start : start + width]
+                ):
+                    yield self._render_runs_(
+                        i, pixels, range(width), symbols, styles, start
+                    )
+        else:
+            for i, columns in sorted(self._damaged_().items()):
+                out = self._render_runs_(
+                    i, self.__BUFFER__[i], sorted(columns), symbols, styles, i * width
+                )
+                if len(out) > 0:
+                    yield out
+
+    def _render_runs_(
+        self,
+        i: int,
+        pixels: list[Pixel],
+        columns: Iterable[int],
+        symbols: list[str] | None = None,
+        styles: list[Style] | None = None,
+        start: int = 0,
+    ) -> bytearray:
+        """Render the changed pixels of a row from the given ascending columns. Adjacent
+        changed pixels form a run which only needs a single cursor move, and the style is
+        only emitted when it changes. A run only continues past pixels whose symbol moves
+        the cursor exactly one column.
 
-        # List of formatted pixels to render
-        result = ""
-
-        if len(self.__CACHE__) != len(self.__BUFFER__):
-            for i, row in enumerate(self.__BUFFER__):
-                for j, col in enumerate(row):
-                    result += f"\x1b[{i+1};{j+1}H{col}"
-
-        for i, (br, sr) in enumerate(zip(self.__BUFFER__, self.__CACHE__)):
-            if len(br) != len(sr):
-                result += "".join(f"\x1b[{i+1};{j+1}H{p}" for j, p in enumerate(br))
-            else:
-                for j, (bp, sp) in enumerate(zip(br, sr)):
-                    if bp != sp:
-                        result += f"\x1b[{i+1};{j+1}H{bp}"
+        Args
+            symbols (list[str] | None): Cached symbol plane. Every column is drawn when omitted.
+            styles (list[Style] | None): Cached style plane.
+            start (int): Index of the row's first pixel in the cached planes.
+        """
+        out = bytearray()
+        style = None
+        last = -2
+        # Whether the cursor is at column `last + 1` after the previous pixel
+        advanced = False
+        for j in columns:
+            pixel = pixels[j]
+            _style = pixel.style
+            if (
+                symbols is not None
+                and styles is not None
+                and pixel.symbol == symbols[start + j]
+                and (_style is styles[start + j] or _style == styles[start + j])
+            ):
+                continue
+
+            if style is None or j != last + 1 or not advanced:
+                if style is not None:
+                    out += b"\x1b[0m"
+                out += self._cup_rows_[i]
+                out += self._cup_cols_[j]
+                out += _style.ansi().encode()
+            elif _style is not style and _style != style:
+                out += b"\x1b[0m"
+                out += _style.ansi().encode()
+            style = _style
+            last = j
+            advanced = pixel._narrow
+            out += pixel._utf8
 
-        return result
+        if style is not None:
+            out += b"\x1b[0m"
+        return out
 
     def write(self, cursor: tuple[int, int] | None = None):
         """Render the buffer and write it to stdout. When finished the current buffer state is cached."""
@@ -152,7 +343,7 @@ class Buffer:
             if cursor is None
             else f"\x1b[{cursor[0]};{cursor[1]}H"
         )
-        _write(f"{self.render()}{final}\x1b[0m")
+        _write_chunks(chain(self._render_chunks_(), (f"{final}\x1b[0m".encode(),)))
         self.cache()
 
     def sub(self, x: int, y: int, w: int, h: int) -> Buffer:
@@ -163,12 +354,12 @@ class Buffer:
 
         buffer = Buffer()
         buffer._default_ = self._default_
-        buffer.__BUFFER__ = [
-            [self.__BUFFER__[r][p] for p in range(x, x+w)]
-            for r in range(y, y+h)
-        ]
+        buffer.__BUFFER__ = [row[x : x + w] for row in self.__BUFFER__[y : y + h]]
         buffer._width_ = w
         buffer._height_ = h
+        buffer._cursor_table_()
+        # The pixels report damage to this buffer so the sub buffer diffs its rows instead
+        buffer._damage = None
         return buffer
 
     @overload
@@ -193,15 +384,24 @@ class Buffer:
 
     def __str__(self) -> str:
         if len(self.__BUFFER__) > 0:
-            result = "".join(str(p) for p in self.__BUFFER__[0])
-            for row in self.__BUFFER__[1:]:
-                result += f"\n{''.join(p.symbol for p in row)}"
-            return result
+            lines = ["".join(str(p) for p in self.__BUFFER__[0])]
+            lines.extend("".join(p.symbol for p in row) for row in self.__BUFFER__[1:])
+            return "\n".join(lines)
         return ""
 
     def __reset__(self):
         """Reset all pixels in the buffer to the default symbol and styling."""
-        for row in range(len(self.__BUFFER__)):
-            for col in range(len(self.__BUFFER__[row])):
-                self.__BUFFER__[row][col].set(self._default_, Style())
+        default = self._default_
+        encoded = default.encode()
+        narrow = _is_narrow(default)
+        for row in self.__BUFFER__:
+            for pixel in row:
+                if pixel.symbol == default and pixel.style is _DEFAULT_STYLE:
+                    continue
+                pixel.symbol = default
+                pixel.style = _DEFAULT_STYLE
+                pixel._utf8 = encoded
+                pixel._narrow = narrow
+                if pixel._damage is not None:
+                    pixel._damage.add(pixel._at)
 
@@ -27,96 +27,105 @@ at-rules => @import, @media, etc...,
 
 from __future__ import annotations
 import re
-from typing import Literal
+from typing import Callable, Literal
 from contui.css.tokens import *
 REPLACEMENT_CHAR = '\uFFFD'
 
-class Check:
-    @staticmethod
-    def letter(current: str | None) -> bool:
-        return current is not None and current.isalpha()
-
-    @staticmethod
-    def non_ascii(current: str | None) -> bool:
-        return current is not None and ord(current) >= ord('\u0080')
-
-    @staticmethod
-    def ident_start(current: str | None) -> bool:
-        return current is not None and (Check.letter(current) or Check.non_ascii(current) or current == "_")
-
-    @staticmethod
-    def digit(current: str | None) -> bool:
-        return current is not None and current.isdigit()
-
-    @staticmethod
-    def whitespace(current: str | None) -> bool:
-        return current is not None and current in '\t\n '
-
-    @staticmethod
-    def hex(current: str | None) -> bool:
-        return current is not None and (current.isdigit() or current in 'abcdefABCDEF')
-
-    @staticmethod
-    def ident(current: str | None) -> bool:
-        return current is not None and (Check.letter(current) or Check.digit(current) or current == "-")
+def _ascii_table(predicate: Callable[[str], bool]) -> bytes:
+    """A lookup table of whether each ascii code point matches the predicate."""
+    return bytes(1 if predicate(chr(i)) else 0 for i in range(128))
+
+LETTER_TABLE = _ascii_table(str.isalpha)
+DIGIT_TABLE = _ascii_table(str.isdigit)
+HEX_TABLE = _ascii_table(lambda c: c.isdigit() or c in 'abcdefABCDEF')
+WHITESPACE_TABLE = _ascii_table(lambda c: c in '\t\n ')
+IDENT_START_TABLE = _ascii_table(lambda c: c.isalpha() or c == "_")
+IDENT_TABLE = _ascii_table(lambda c: c.isalpha() or c.isdigit() or c in "_-")
+NON_PRINTABLE_TABLE = _ascii_table(
+    lambda c: 0x00 <= ord(c) < 0x08 or c == "\t" or 0x0E <= ord(c) < 0x1F or ord(c) == 0x7F
+)
+
+def is_letter(current: str | None) -> bool:
+    if current is None:
+        return False
+    o = ord(current)
+    return LETTER_TABLE[o] == 1 if o < 128 else current.isalpha()
 
-    @staticmethod
-    def escape(current: str | None, next: str | None) -> bool:
-        return current == "\\" and next != "\n"
+def is_non_ascii(current: str | None) -> bool:
+    return current is not None and ord(current) >= 0x80
 
-    @staticmethod
-    def non_printable(current: str | None) -> bool:
-        o = ord(current or '')
-        return (
-            current is not None
-            and (
-                o in range(ord('\u0000'), ord('\u0008'))
-                or current == "\t"
-                or o in range(ord('\u000E'), ord('\u001F'))
-                or o == ord('\u007F')
-            )
-        )
+def is_ident_start(current: str | None) -> bool:
+    if current is None:
+        return False
+    o = ord(current)
+    # Every non ascii code point can start an ident
+    return o >= 0x80 or IDENT_START_TABLE[o] == 1
 
-    @staticmethod
-    def starts_with_ident(first: str | None, second: str | None, third: str | None) -> bool:
-        if second is None or third is None:
-            return False
-
-        if Check.ident_start(first):
-            return True
-        elif (
-            first == "-"
-            and (Check.ident_start(second) or second == "-")
-            or Check.escape(second, third)
-        ):
-            return True
-        elif first == "\\" and Check.escape(first, second):
-            return True
+def is_digit(current: str | None) -> bool:
+    if current is None:
         return False
+    o = ord(current)
+    return o < 128 and DIGIT_TABLE[o] == 1
 
-    @staticmethod
-    def starts_with_number(first: str, second: str | None, third: str | None) -> bool:
-        if first in "+-":
-            if Check.digit(second):
-                return True
-            elif second == "." and Check.digit(third):
-                return True
-            return False
-        elif first == ".":
-            return Check.digit(second)
-        elif Check.digit(first):
-            return True
+def is_whitespace(current: str | None) -> bool:
+    if current is None:
         return False
+    o = ord(current)
+    return o < 128 and WHITESPACE_TABLE[o] == 1
 
+def is_hex(current: str | None) -> bool:
+    if current is None:
+        return False
+    o = ord(current)
+    return o < 128 and HEX_TABLE[o] == 1
 
+def is_ident(current: str | None) -> bool:
+    if current is None:
+        return False
+    o = ord(current)
+    # Every non ascii code point is an ident code point
+    return o >= 0x80 or IDENT_TABLE[o] == 1
 
+def is_escape(current: str | None, next: str | None) -> bool:
+    return current == "\\" and next != "\n"
 
-RETURNS = re.compile("\r\n|\f|\r")
+def is_non_printable(current: str | None) -> bool:
+    if current is None:
+        return False
+    o = ord(current)
+    return o < 128 and NON_PRINTABLE_TABLE[o] == 1
+
+# Three code point windows that would start an ident or a number
+STARTS_IDENT_RE = re.compile(r"-?[A-Za-z_\x80-\U0010ffff]|--|-?\\(?:[^\n]|\Z)")
+STARTS_NUMBER_RE = re.compile(r"[+-]?\.?[0-9]")
+
+def starts_with_ident(source: str, index: int) -> bool:
+    """Whether the code points starting at the index would start an ident."""
+    return STARTS_IDENT_RE.match(source, index) is not None
+
+def starts_with_number(source: str, index: int) -> bool:
+    """Whether the code points starting at the index would start a number."""
+    return STARTS_NUMBER_RE.match(source, index) is not None
+
+# Runs of code points that can be consumed in a single match
+IDENT_RE = re.compile(r"[A-Za-z0-9_\-\x80-\U0010ffff]*")
+WHITESPACE_RE = re.compile(r"[\t\n ]+")
+HEX_RE = re.compile(r"[0-9A-Fa-f]{1,6}")
+# Code points that make a url bad or need the escape handling of the slow path
+URL_BAD_RE = re.compile(r"[\t\n '\"(\\\x00-\x07\x0e-\x1e\x7f]")
+# Sign, integer part, fraction, and exponent of a number
+NUMBER_RE = re.compile(r"[+-]?[0-9]*(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+
+# Newline and null normalization applied to the source in a single translate pass
+PREPROCESS = str.maketrans({"\r": "\n", "\f": "\n", "\u0000": REPLACEMENT_CHAR})
 class Lexer:
     def __init__(self, source: str) -> None:
-        self.source: list[str] = list(RETURNS.sub("\n", source).replace('\u0000', REPLACEMENT_CHAR))
+        source = source.replace("\r\n", "\n")
+        if "\r" in source or "\f" in source or "\u0000" in source:
+            source = source.translate(PREPROCESS)
+        self.source: str = source
+        # Position of the next code point in the source
         self.index = 0
-        self.pos = [1, 1]
         self.errors = []
 
     @staticmethod
@@ -131,171 +140,152 @@ class Lexer:
             tuple[str, bytes]: The charset and the sources bytes.
         """
         with open(path, "rb") as f:
-            if (chrst := f.read(8)) == b'@charset':
-                chrst = b''
-                while (byte := f.read(1)) != b";":
-                    chrst += byte
-                chrst = chrst.decode().strip().replace('"', "").lower()
-                # PERF: Optimize and read per char
-                return (
-                    f.read()
-                    .decode(chrst)
-                    .strip()
-                )
+            data = f.read()
+
+        if data.startswith(b'@charset') and (end := data.find(b";", 8)) != -1:
+            chrst = data[8:end].decode().strip().replace('"', "").lower()
             return (
-                (chrst + f.read())
-                .decode()
+                data[end+1:]
+                .decode(chrst)
                 .strip()
             )
+        return data.decode().strip()
 
     def __iter__(self):
         return self
 
     def __next__(self):
         next = self.consume()
-        if isinstance(next, EOF):
+        if next is END_OF_FILE:
             raise StopIteration
         return next
 
     def process(self) -> list[Token]:
         """Parses the entire source at once."""
-        return [token for token in self]
+        tokens = []
+        append, consume = tokens.append, self.consume
+        # Drive consume directly instead of going through the iterator protocol per token
+        while (token := consume()) is not END_OF_FILE:
+            append(token)
+        return tokens
 
     def peek(self, amount: int = 1) -> str | None:
         """The next code point."""
-        if len(self.source) >= amount:
-            return self.source[amount-1]
+        index = self.index + amount - 1
+        if index < len(self.source):
+            return self.source[index]
         return None
 
     def next(self) -> str:
-        if len(self.source) >= 1:
-            return self.source.pop(0)
+        if self.index < len(self.source):
+            self.index += 1
+            return self.source[self.index - 1]
         return "_error_"
 
+    def reconsume(self):
+        """Step back so the last consumed code point is consumed again."""
+        self.index -= 1
+
     def error(self, error: Exception):
         self.errors.append(error)
 
     def _consume_comment_(self, current: str) -> Comment:
-        comment = Comment(current + self.next())
-        next = self.next()
-        while self.peek() != "/" or next != "*":
-            if next is None or self.peek() is None:
-                raise ParseError("Comment not closed")
-            comment.raw += next
-            next = self.next()
-        comment.raw += "*/"
-        self.next()
-        return comment
+        start = self.index - 1
+        end = self.source.find("*/", self.index + 1)
+        if end == -1:
+            raise ParseError("Comment not closed")
+        self.index = end + 2
+        return Comment(self.source[start:self.index])
 
     def _consume_whitespace_(self, current: str) -> Whitespace:
-        whitespace = Whitespace(current)
-        while (peek := self.peek()) is not None and peek in "\n\t ":
-            whitespace.raw += self.next()
-        return whitespace
+        # The current code point is part of the run so the token is a single slice
+        match = WHITESPACE_RE.match(self.source, self.index - 1)
+        self.index = match.end()
+        raw = match.group()
+        if (common := WHITESPACES.get(raw)) is not None:
+            return common
+        return Whitespace(raw)
 
     def _consume_string_(self, current: str, ending: str|None = None) -> String | BadString:
-        # print(current, ending)
-        # input()
         ending = ending or current
         if self.peek() is None:
             return BadString()
 
-        string = String()
+        # Most strings have no escapes or newlines and can be sliced out directly
+        end = self.source.find(ending, self.index)
+        if end != -1:
+            segment = self.source[self.index:end]
+            if "\\" not in segment and "\n" not in segment:
+                self.index = end + 1
+                return String(segment)
+
+        parts: list[str] = []
         escaped = False
         while True:
             if self.peek() is None:
                 self.error(ParseError("String was not closed"))
-                return string
+                return String("".join(parts))
             if (next := self.next()) == "\\":
                 escaped = True
             elif next == "\n" and escaped:
                 continue
             elif next == "\n":
                 self.error(SyntaxError("String literal not closed"))
-                return BadString(string.raw)
+                return BadString("".join(parts))
             elif not escaped and next == ending:
-                return string
+                return String("".join(parts))
             else:
-                string.raw += next
+                parts.append(next)
                 escaped = False
 
     def _consume_escape_(self, current: str) -> str:
         if self.peek() is None:
             return REPLACEMENT_CHAR
 
-        next = self.next()
-        if Check.hex(next):
-            output = next
-            while Check.hex(self.peek()) and len(output) < 7:
-                output += self.next()
-            if Check.digit(output) and int(output) == 0 or int(output, 16) > int("10FFFF", 16):
-                return REPLACEMENT_CHAR
-            return current + output
-        else:
-            return next
+        if (match := HEX_RE.match(self.source, self.index)) is None:
+            return self.next()
 
-    def _consume_ident_(self) -> str:
-        result = ''
+        self.index = match.end()
+        # A single whitespace after the hex digits is part of the escape
+        if is_whitespace(self.peek()):
+            self.index += 1
+        code = int(match.group(), 16)
+        if code == 0 or code > 0x10FFFF or 0xD800 <= code <= 0xDFFF:
+            return REPLACEMENT_CHAR
+        return chr(code)
 
-        while self.peek() is not None:
-            next = self.next()
-            if Check.ident(next):
-                result += next
-            elif Check.escape(next, self.peek()):
-                result += self._consume_escape_(next)
-            else:
-                self.source.insert(0, next)
-                return result
-        return result
+    def _consume_ident_(self) -> str:
+        result = []
+        while True:
+            match = IDENT_RE.match(self.source, self.index)
+            result.append(match.group())
+            self.index = match.end()
+            if not is_escape(self.peek(), self.peek(2)):
+                return "".join(result)
+            result.append(self._consume_escape_(self.next()))
 
     def _consume_hash_(self, current: str) -> Hash | Delim:
-        if len(self.source) >= 1:
-            if Check.ident(self.peek()) or Check.escape(self.peek(), self.peek(2)):
-                hasht = Hash('#')
-                first = self.peek()
-                second = self.peek(2)
-                third = self.peek(3)
-                if Check.starts_with_ident(first, second, third):
-                    hasht.type = "id"
-                hasht.raw = self._consume_ident_()
-                return hasht
-        return Delim(current)
-
-    def _consume_number_(self) -> tuple[int, Literal['integer', 'number'], str]:
+        if self.index < len(self.source):
+            if is_ident(self.peek()) or is_escape(self.peek(), self.peek(2)):
+                _type = "id" if starts_with_ident(self.source, self.index) else "unrestricted"
+                return Hash(self._consume_ident_(), type=_type)
+        return DELIMS[current]
+
+    def _consume_number_(self) -> tuple[int | float, Literal['integer', 'number'], str]:
         """Consume a number from the code points. Returning a numeric value and a type
         of either integer or number.
         """
-        _type = 'integer'
-        raw = ''
-        if (peek := self.peek()) is not None and peek in "-+":
-            raw += self.next()
-
-        while Check.digit(self.peek()):
-            raw += self.next()
-
-        if self.peek() == "." and Check.digit(self.peek(2)):
-            raw += self.next() + self.next()
-            _type = "number"
-            while Check.digit(self.peek()):
-                raw += self.next()
-            return int(raw), _type, raw
-        elif (peek := self.peek()) is not None and peek in "Ee":
-            science = ''
-            _type = "number"
-            _t = self.next() # Consume the E
-            if (peek := self.peek(2)) is not None and peek in "-+" and Check.digit(self.peek(3)):
-                science = self.next() + self.next()
-            elif Check.digit(self.peek(2)):
-                science = self.next()
-            while Check.digit(self.peek()):
-                science += self.next()
-            return int(raw) * (10 ** int(science)), _type, raw + _t + science
-        return int(raw), _type, raw
+        match = NUMBER_RE.match(self.source, self.index)
+        self.index = match.end()
+        raw = match.group()
+        if match.group(1) is None and match.group(2) is None:
+            return int(raw), 'integer', raw
+        return float(raw), 'number', raw
 
     def _consume_numeric_(self) -> Number | Percentage | Dimension:
         """Consume code points a produce a Number, Percentage, or Dimension token."""
         number = self._consume_number_()
-        if Check.starts_with_ident(self.peek(), self.peek(2), self.peek(3)):
+        if starts_with_ident(self.source, self.index):
             dim = Dimension(number[0], number[1], '', number[2])
             dim.unit = self._consume_ident_()
             dim.raw += dim.unit
@@ -306,19 +296,31 @@ class Lexer:
         return Number(*number)
 
     def _consume_remnant_bad_url_(self):
+        _is_escape = is_escape
         next = self.next()
         while True:
             if next in ["_error_", ")"]:
                 return
-            elif Check.escape(next, self.peek()):
+            elif _is_escape(next, self.peek()):
                 self._consume_escape_(next)
             next = self.next()
 
     def _consume_url_(self) -> Url | BadUrl:
         url = Url()
-        while Check.whitespace(self.peek()):
-            self.next()
+        if is_whitespace(self.peek()):
+            self.index = WHITESPACE_RE.match(self.source, self.index).end()
+
+        # Most urls are a plain run of code points up to the closing parenthesis
+        end = self.source.find(")", self.index)
+        if end != -1:
+            raw = self.source[self.index:end].rstrip("\t\n ")
+            if URL_BAD_RE.search(raw) is None:
+                url.raw = raw
+                self.index = end + 1
+                return url
 
+        # Bound once since the loop checks every code point of the url
+        _is_whitespace, _is_non_printable = is_whitespace, is_non_printable
         if self.peek() is None:
             self.error(ParseError("Url not closed"))
 
@@ -326,21 +328,23 @@ class Lexer:
         while True:
             if next == ")":
                return url 
-            elif Check.whitespace(next):
-                while Check.whitespace(self.peek()):
-                    self.next()
-                if (peek := self.peek()) is None or peek == ")":
+            elif _is_whitespace(next):
+                while _is_whitespace(self.peek()):
                     self.next()
+                if (peek := self.peek()) is None:
                     self.error(ParseError("Url not closed"))
                     return url
+                elif peek == ")":
+                    self.next()
+                    return url
                 else:
                     self._consume_remnant_bad_url_()
                     return BadUrl()
-            elif next in '\'"(' or Check.non_printable(next):
+            elif next in '\'"(' or _is_non_printable(next):
                 self._consume_remnant_bad_url_()
                 return BadUrl()
             elif next == "\\":
-                if Check.escape(next, self.peek()):
+                if is_escape(next, self.peek()):
                     url.raw += self._consume_escape_(next)
                 else:
                     self.error(ParseError("Invalid backslash in url"))
@@ -359,11 +363,9 @@ class Lexer:
         ident = self._consume_ident_()
         if ident == "url" and self.peek() == "(":
             self.next()
-            while Check.whitespace(self.peek()) and Check.whitespace(self.peek(2)):
+            while is_whitespace(self.peek()) and is_whitespace(self.peek(2)):
                 self.next()
-            two = (self.peek() or '') + (self.peek(2) or '')
-            one = (self.peek() or '')
-            if (len(two) == 2 and two[0] == " " and two[1] in '\'"') or (len(one) == 1 and one in '\'"'):
+            if self.source.startswith(("'", '"', " '", ' "'), self.index):
                 return Function(ident)
             else:
                 return self._consume_url_()
@@ -371,87 +373,162 @@ class Lexer:
             self.next()
             return Function(ident)
         if ident == "":
-            input(ident)
+            self.error(ParseError("Empty identifier"))
+        if (common := COMMON_IDENTS.get(ident)) is not None:
+            return common
         return Ident(ident)
 
-    def consume(self) -> Token:
-        """Consume code points and return the next token."""
-        next = self.next()
-        if next == "_error_":
-            return EOF()
-        elif next == "/" and self.peek() == "*":
-            return self._consume_comment_(next)
-        elif next in '"\'':
-            return self._consume_string_(next)
-        elif next == '#':
-            return self._consume_hash_(next)
-        elif next == "+":
-            if Check.starts_with_number(next, self.peek(), self.peek(2)):
-                self.source.insert(0, next)
-                return self._consume_numeric_()
-            return Delim(next)
-        elif next == "-":
-            if Check.starts_with_number(next, self.peek(), self.peek(2)):
-                self.source.insert(0, next)
-                return self._consume_numeric_()
-            elif self.peek(2) == "-" and self.peek(3) == ">":
-                self.next()
-                self.next()
-                return CDC('-->')
-            elif Check.starts_with_ident(next, self.peek(2), self.peek(3)):
-                self.source.insert(0, next)
-                return self._consume_ident_like_()
-            return Delim(next)
-        elif next == ".":
-            if Check.starts_with_number(next, self.peek(2), self.peek(3)):
-                self.source.insert(0, next)
-                return self._consume_numeric_()
-            return Delim(next)
-        elif next == "<":
-            if (self.peek(1)or'') + (self.peek(2) or '') + (self.peek(3) or '') == "!--":
-                self.next()
-                self.next()
-                self.next()
-                return CDO('<!--')
-            return Delim("<")
-        elif next == "@":
-            if Check.starts_with_ident(self.peek(), self.peek(2), self.peek(3)):
-                return AtKeyword(self._consume_ident_())
-            return Delim(next)
-        elif next == "\\":
-            if Check.escape(next, self.peek()):
-                self.source.insert(0, next)
-                return self._consume_ident_like_()
-            self.error(ParseError("Invalid backslash"))
-            return Delim(next)
-        elif Check.digit(next):
-            self.source.insert(0, next)
+    def _consume_delim_(self, current: str) -> Delim:
+        return DELIMS[current]
+
+    def _consume_solidus_(self, current: str) -> Comment | Delim:
+        if self.peek() == "*":
+            return self._consume_comment_(current)
+        return DELIMS[current]
+
+    def _consume_plus_(self, current: str) -> Number | Percentage | Dimension | Delim:
+        if starts_with_number(self.source, self.index - 1):
+            self.reconsume()
+            return self._consume_numeric_()
+        return DELIMS[current]
+
+    def _consume_minus_(self, current: str) -> Token:
+        if starts_with_number(self.source, self.index - 1):
+            self.reconsume()
             return self._consume_numeric_()
-        elif Check.ident_start(next):
-            self.source.insert(0, next)
+        elif self.peek() == "-" and self.peek(2) == ">":
+            self.next()
+            self.next()
+            return CDC_TOKEN
+        elif starts_with_ident(self.source, self.index - 1):
+            self.reconsume()
             return self._consume_ident_like_()
-        elif next in "\n\t ":
-            return self._consume_whitespace_(next)
-        elif next == "(":
-            return LParantheses(next)
-        elif next == ")":
-            return RParantheses(next)
-        elif next == "[":
-            return LSquareBracket(next)
-        elif next == "]":
-            return RSquareBracket(next)
-        elif next == "{":
-            return LCurlyBracket(next)
-        elif next == "}":
-            return RCurlyBracket(next)
-        elif next == ",":
-            return Comma(next)
-        elif next == ":":
-            return Colon(next)
-        elif next == ";":
-            return Semicolon(next)
-        else:
-            return Delim(next)
+        return DELIMS[current]
+
+    def _consume_full_stop_(self, current: str) -> Number | Percentage | Dimension | Delim:
+        if starts_with_number(self.source, self.index - 1):
+            self.reconsume()
+            return self._consume_numeric_()
+        return DELIMS[current]
+
+    def _consume_less_than_(self, current: str) -> CDO | Delim:
+        if self.source.startswith("!--", self.index):
+            self.index += 3
+            return CDO_TOKEN
+        return DELIMS[current]
+
+    def _consume_at_(self, current: str) -> AtKeyword | Delim:
+        if starts_with_ident(self.source, self.index):
+            keyword = self._consume_ident_()
+            if (common := COMMON_AT_KEYWORDS.get(keyword)) is not None:
+                return common
+            return AtKeyword(keyword)
+        return DELIMS[current]
+
+    def _consume_reverse_solidus_(self, current: str) -> Token:
+        if is_escape(current, self.peek()):
+            self.reconsume()
+            return self._consume_ident_like_()
+        self.error(ParseError("Invalid backslash"))
+        return DELIMS[current]
+
+    def _consume_digit_(self, _: str) -> Number | Percentage | Dimension:
+        self.reconsume()
+        return self._consume_numeric_()
+
+    def _consume_ident_start_(self, _: str) -> Ident | Function | Url | BadUrl:
+        self.reconsume()
+        return self._consume_ident_like_()
+
+    def consume(self) -> Token:
+        """Consume code points and return the next token."""
+        if self.index >= len(self.source):
+            return END_OF_FILE
+
+        next = self.source[self.index]
+        self.index += 1
+        o = ord(next)
+        if o < 128:
+            return DISPATCH[o](self, next)
+        # Every non ascii code point starts an ident
+        return self._consume_ident_start_(next)
+
+# Tokens that are exactly one code point carry no state, so one instance is shared
+L_PARANTHESES = LParantheses("(")
+R_PARANTHESES = RParantheses(")")
+L_SQUARE_BRACKET = LSquareBracket("[")
+R_SQUARE_BRACKET = RSquareBracket("]")
+L_CURLY_BRACKET = LCurlyBracket("{")
+R_CURLY_BRACKET = RCurlyBracket("}")
+COMMA = Comma._fast(",")
+COLON = Colon._fast(":")
+SEMICOLON = Semicolon._fast(";")
+CDO_TOKEN = CDO("<!--")
+CDC_TOKEN = CDC("-->")
+# The end of the source is checked for by identity
+END_OF_FILE = EOF()
+# Whitespace runs between and inside of indented rules repeat throughout a stylesheet
+WHITESPACES = {
+    raw: Whitespace(raw)
+    for prefix in ("", "\n", "\n\n")
+    for raw in (prefix + " " * i for i in range(17))
+    if raw != ""
+}
+WHITESPACES.update({"\t": Whitespace("\t"), "\n\t": Whitespace("\n\t")})
+# Delimiters are always a single ascii code point when they reach the lexer's handlers
+DELIMS = {chr(i): Delim._fast(chr(i)) for i in range(128)}
+
+# Idents and at keywords that show up in most stylesheets are shared instead of allocated
+COMMON_IDENTS = {
+    name: Ident(name)
+    for name in (
+        "color", "background", "background-color", "margin", "padding", "border",
+        "width", "height", "display", "text-align", "align-items", "text-decoration",
+        "font-weight", "font-style", "important", "none", "auto", "inherit", "initial",
+        "start", "center", "end", "block", "inline", "flex", "solid", "bold", "italic",
+    )
+}
+COMMON_AT_KEYWORDS = {
+    name: AtKeyword(name)
+    for name in ("media", "import", "charset", "supports", "keyframes", "font-face", "layer", "namespace")
+}
+
+def _single_(token: Token) -> Callable[[Lexer, str], Token]:
+    """Dispatch to a shared token that is exactly one code point."""
+    return lambda _, __: token
+
+def _dispatch_table() -> list[Callable[[Lexer, str], Token]]:
+    """Build the handler used by `Lexer.consume` for each ascii code point."""
+    table: list[Callable[[Lexer, str], Token]] = [Lexer._consume_delim_] * 128
+    for i in range(128):
+        if is_digit(chr(i)):
+            table[i] = Lexer._consume_digit_
+        elif is_ident_start(chr(i)):
+            table[i] = Lexer._consume_ident_start_
+
+    for char in "\n\t ":
+        table[ord(char)] = Lexer._consume_whitespace_
+    table[ord('"')] = table[ord("'")] = Lexer._consume_string_
+    table[ord("/")] = Lexer._consume_solidus_
+    table[ord("#")] = Lexer._consume_hash_
+    table[ord("+")] = Lexer._consume_plus_
+    table[ord("-")] = Lexer._consume_minus_
+    table[ord(".")] = Lexer._consume_full_stop_
+    table[ord("<")] = Lexer._consume_less_than_
+    table[ord("@")] = Lexer._consume_at_
+    table[ord("\\")] = Lexer._consume_reverse_solidus_
+    table[ord("(")] = _single_(L_PARANTHESES)
+    table[ord(")")] = _single_(R_PARANTHESES)
+    table[ord("[")] = _single_(L_SQUARE_BRACKET)
+    table[ord("]")] = _single_(R_SQUARE_BRACKET)
+    table[ord("{")] = _single_(L_CURLY_BRACKET)
+    table[ord("}")] = _single_(R_CURLY_BRACKET)
+    table[ord(",")] = _single_(COMMA)
+    table[ord(":")] = _single_(COLON)
+    table[ord(";")] = _single_(SEMICOLON)
+    return table
+
+DISPATCH = _dispatch_table()
 
 class ParseError(Exception): pass
 
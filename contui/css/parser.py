@@ -3,18 +3,21 @@ https://www.w3.org/TR/css-syntax-3/#parsing
 """
 
 from __future__ import annotations
-from typing import Any, Generic, Literal, Optional, TypeVar
-from contui.css.lexer import Lexer, ParseError
+from functools import lru_cache
+from typing import Any, Generic, Literal, Optional, Sequence, TypeVar
+from contui.css.lexer import END_OF_FILE, Lexer, ParseError
 
 from contui.css.tokens import *
 
 class Preserved:
+    __slots__ = ("token",)
     token: Token
     def __init__(self, token: Token) -> None:
         # NOTE: Not function, {}, (), [], bad-string, or bad-url tokens
         self.token = token
 
 class FunctionBlock:
+    __slots__ = ("name", "value")
     name: str
     value: list[Component]
     def __init__(self, name: str, value: list | None = None) -> None:
@@ -22,6 +25,7 @@ class FunctionBlock:
         self.value = value or []
 
 class Block:
+    __slots__ = ("token", "value")
     token: LCurlyBracket | LSquareBracket | LParantheses
     value: list[Component]
     def __init__(self, token: LCurlyBracket | LSquareBracket | LParantheses) -> None:
@@ -29,6 +33,7 @@ class Block:
         self.value = []
 
 class Decleration:
+    __slots__ = ("name", "value", "important")
     important: bool
     name: str
     value: list[Component]
@@ -42,10 +47,13 @@ class Decleration:
 
 Component = Preserved | FunctionBlock | Decleration | Block
 
-class PropertyDecl(Decleration): pass
-class DescriptorDecl(Decleration): pass
+class PropertyDecl(Decleration):
+    __slots__ = ()
+class DescriptorDecl(Decleration):
+    __slots__ = ()
 
 class QualifiedRule:
+    __slots__ = ("prelude", "block")
     prelude: list[Component]
     block: Block | None
     def __init__(self, prelude: list[Component] | None = None, block: Block | None = None) -> None:
@@ -56,6 +64,7 @@ class QualifiedRule:
         return f"QualifiedRule(prelude={self.prelude}, block={{...}})"
 
 class AtRule:
+    __slots__ = ("name", "prelude", "block")
     name: str
     prelude: list[Component]
     block: Optional[Block]
@@ -117,14 +126,12 @@ class CSSStylesheet(Generic[T]):
             raise NotAllowedError 
 
         parsed_rule = Parse.parse_rule(rule)
-
-        rule = Parse.parse_rule(rule)
-        if parsed_rule == "@import" and self.constructed:
+        if isinstance(parsed_rule, AtRule) and parsed_rule.name == "import" and self.constructed:
             raise SyntaxError
-        if isinstance(rule, AtRule) and rule.name == "namespace" and not all(isinstance(v, AtRule) and v.name in ["namespace", "import"] for v in self.css_rules):
+        if isinstance(parsed_rule, AtRule) and parsed_rule.name == "namespace" and not all(isinstance(v, AtRule) and v.name in ["namespace", "import"] for v in self.css_rules):
             raise InvalidStateError
 
-        self._css_rules_.insert(index, rule)
+        self._css_rules_.insert(index, parsed_rule)
         return index
 
     def deleteRule(self, index: int):
@@ -168,14 +175,29 @@ class InvalidStateError(Exception):pass
 
 Tokens = list[Token] | str | list[Component] 
 
+# Sources longer than this are tokenized every time instead of held in the cache
+CACHED_SOURCE_LIMIT = 4096
+
+@lru_cache(maxsize=256)
+def _cached_tokenize(source: str) -> tuple[Token, ...]:
+    return tuple(Lexer(source).process())
+
+def _tokenize(source: str) -> tuple[Token, ...]:
+    """Tokenize a source string. The same rules and inline styles are often parsed repeatedly,
+    and tokens are never mutated, so the tokens of short sources are cached and shared.
+    Whole stylesheets are usually parsed once, so they aren't kept alive by the cache.
+    """
+    if len(source) > CACHED_SOURCE_LIMIT:
+        return tuple(Lexer(source).process())
+    return _cached_tokenize(source)
+
 class Parse:
     @staticmethod
-    def normalize(_input_: Tokens) -> list[Token] | list[Component]:
+    def normalize(_input_: Tokens) -> list[Token] | list[Component] | tuple[Token, ...]:
         if isinstance(_input_, list):
             return _input_
         elif isinstance(_input_, str):
-            lexer = Lexer(_input_)
-            return lexer.process()
+            return _tokenize(_input_)
         raise TypeError(
             "Unexpected input to parse. Expected string, list of tokens, or list of component values."
         )
@@ -183,14 +205,12 @@ class Parse:
     @staticmethod
     def parse_component_value(source: Tokens) -> Component:
         parser = Parser(source)
-        while isinstance(parser.peek(), Whitespace):
-            parser.next()
-        if isinstance(parser.peek(), EOF):
+        parser.skip_whitespace()
+        if parser.peek() is END_OF_FILE:
             raise SyntaxError("Expected component value")
         cv = parser.consume_component_value()
-        while isinstance(parser.peek(), Whitespace):
-            parser.next()
-        if isinstance(parser.peek(), EOF):
+        parser.skip_whitespace()
+        if parser.peek() is END_OF_FILE:
             return cv
         raise SyntaxError("Expected only a component value but recieve more tokens")
 
@@ -198,7 +218,7 @@ class Parse:
     def parse_component_values(_input_: Tokens) -> list[Component]:
         parser = Parser(_input_)
         result = []
-        while not isinstance(val := parser.consume_component_value(), EOF):
+        while (val := parser.consume_component_value()) is not END_OF_FILE:
             result.append(val)
         return result
 
@@ -212,7 +232,7 @@ class Parse:
         current = []
         while True:
             next = parser.consume_component_value()
-            if isinstance(next, EOF):
+            if next is END_OF_FILE:
                 if len(current) > 0:
                     result.append(current)
                 break
@@ -233,11 +253,10 @@ class Parse:
     def parse_rule(_input_: Tokens):
         parser = Parser(_input_)
 
-        while isinstance(parser.peek(), Whitespace):
-            parser.next()
+        parser.skip_whitespace()
 
         rule = None
-        if isinstance(parser.peek(), EOF):
+        if parser.peek() is END_OF_FILE:
             raise SyntaxError
         elif isinstance(parser.peek(), AtKeyword):
             rule = parser.consume_at_rule()
@@ -246,18 +265,16 @@ class Parse:
             if rule is None:
                 raise SyntaxError("Invalid rule")
 
-        while isinstance(parser.peek(), Whitespace):
-            parser.next()
+        parser.skip_whitespace()
 
-        if isinstance(parser.peek(), EOF):
+        if parser.peek() is END_OF_FILE:
             return rule
         raise SyntaxError("Invalid rule, more tokens then expected")
 
     @staticmethod
     def parse_decleration(source: Tokens) -> Decleration:
         parser = Parser(source)
-        while isinstance(parser.peek(), Whitespace):
-            parser.next()
+        parser.skip_whitespace()
 
         if not isinstance(parser.peek(), Ident):
             raise SyntaxError("Missing ident for decleration")
@@ -289,197 +306,264 @@ class Parser:
     # List of css component values, return input
     # string, filter code points, tokenize result, and return final
     def __init__(self, tokens: Tokens) -> None:
-        self.tokens: list[Token] | list[Component] = Parse.normalize(tokens)
+        # The cursor never mutates the tokens so lists are read in place instead of copied
+        self.tokens: Sequence[Token | Component] = Parse.normalize(tokens)
+        # The end is checked for by identity, so an end of file token passed in by the
+        # caller is dropped and the end of the sequence stands in for it
+        if len(self.tokens) > 0 and isinstance(self.tokens[-1], EOF):
+            self.tokens = self.tokens[:-1]
+        # Position of the next token
+        self.index = 0
         self.errors: list[Exception] = []
 
     def peek(self, amount: int = 1) -> Token | Component:
-        if len(self.tokens) >= amount:
-            return self.tokens[amount - 1]
-        return EOF()
-
-    def reconsume(self, value):
-        self.tokens.insert(0, value)
+        index = self.index + amount - 1
+        if index < len(self.tokens):
+            return self.tokens[index]
+        return END_OF_FILE
+
+    def reconsume(self):
+        """Step back so the last consumed token is consumed again."""
+        self.index -= 1
+
+    def skip_whitespace(self):
+        """Step over any whitespace tokens at the cursor."""
+        tokens, index = self.tokens, self.index
+        while index < len(tokens) and type(tokens[index]) is Whitespace:
+            index += 1
+        self.index = index
 
     def next(self) -> Token | Component:
-        if len(self.tokens) >= 1:
-            return self.tokens.pop(0)
-        return EOF()
+        if self.index < len(self.tokens):
+            self.index += 1
+            return self.tokens[self.index - 1]
+        return END_OF_FILE
 
     def error(self, error: Exception):
         self.errors.append(error)
 
     def consume_block(self, opening: LCurlyBracket | LSquareBracket | LParantheses) -> Block:
         block = Block(opening)
+        closing = opening.alt
+        _next = self.next
+        _dispatch = COMPONENT_DISPATCH.get
+        append = block.value.append
         while True:
-            next = self.next()
-            if isinstance(next, opening.alt):
+            next = _next()
+            if type(next) is closing:
                 return block
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 self.error(ParseError("Block was not closed"))
                 return block
             else:
-                self.reconsume(next)
-                block.value.append(self.consume_component_value())
+                # Dispatch on the token already read instead of stepping back for it
+                handler = _dispatch(type(next))
+                append(next if handler is None else handler(self, next))
 
     def consume_function(self, function: Function) -> FunctionBlock:
         fblock = FunctionBlock(function.raw)
+        _next = self.next
+        _dispatch = COMPONENT_DISPATCH.get
+        append = fblock.value.append
         while True:
-            next = self.next()
-            if isinstance(next, RParantheses):
+            next = _next()
+            if type(next) is RParantheses:
                 return fblock
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 self.error(ParseError("Function was not closed"))
                 return fblock
             else:
-                self.reconsume(next)
-                fblock.value.append(self.consume_component_value())
+                handler = _dispatch(type(next))
+                append(next if handler is None else handler(self, next))
 
     def consume_component_value(self) -> Component:
         next = self.next()
-        if isinstance(next, (LCurlyBracket, LSquareBracket, LParantheses)):
-            return self.consume_block(next)
-        elif isinstance(next, Function):
-            return self.consume_function(next)
+        if (handler := COMPONENT_DISPATCH.get(type(next))) is not None:
+            return handler(self, next)
         return next
 
     def consume_at_rule(self) -> AtRule:
         next = self.next()
         at_rule = AtRule(next.raw)
 
+        _next = self.next
+        _dispatch = COMPONENT_DISPATCH.get
+        append = at_rule.prelude.append
         while True:
-            next = self.next()
-            if isinstance(next, Semicolon):
+            next = _next()
+            _type = type(next)
+            if _type is Semicolon:
                 return at_rule
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 self.error(ParseError("At Rule missing semi-colon"))
                 return at_rule
-            elif isinstance(next, LCurlyBracket):
+            elif _type is LCurlyBracket:
                 at_rule.block = self.consume_block(next)
                 return at_rule
-            elif isinstance(next, Block) and isinstance(next.token, LCurlyBracket):
+            elif _type is Block and type(next.token) is LCurlyBracket:
                 at_rule.block = next
                 return at_rule
             else:
-                self.reconsume(next)
-                at_rule.prelude.append(self.consume_component_value())
+                handler = _dispatch(_type)
+                append(next if handler is None else handler(self, next))
 
     def consume_qualified_rule(self) -> QualifiedRule | None:
         qrule = QualifiedRule()
+        _next = self.next
+        _dispatch = COMPONENT_DISPATCH.get
+        append = qrule.prelude.append
         while True:
-            next = self.next()
-            if isinstance(next, EOF):
+            next = _next()
+            if next is END_OF_FILE:
                 self.error(ParseError("Qualified rule is not closed"))
                 return None
-            elif isinstance(next, LCurlyBracket):
+            elif (_type := type(next)) is LCurlyBracket:
                 qrule.block = self.consume_block(next)
                 return qrule
-            elif isinstance(next, Block) and isinstance(next.token, LCurlyBracket):
+            elif _type is Block and type(next.token) is LCurlyBracket:
                 qrule.block = next
                 return qrule
             else:
-                self.reconsume(next)
-                qrule.prelude.append(self.consume_component_value())
+                handler = _dispatch(_type)
+                append(next if handler is None else handler(self, next))
 
     def consume_rule_list(self, top_level: bool = False) -> list[QualifiedRule | AtRule]:
         rules = []
+        _next = self.next
+        _reconsume = self.reconsume
         while True:
-            next = self.next()
-            if isinstance(next, Whitespace):
+            next = _next()
+            # None of these token types have subclasses so the exact type is compared
+            _type = type(next)
+            if _type is Whitespace:
                 continue
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 return rules
-            elif isinstance(next, (CDO, CDC)):
+            elif _type is CDO or _type is CDC:
                 if top_level: continue
-                self.reconsume(next)
+                _reconsume()
                 if (rule := self.consume_qualified_rule()) is not None:
                     rules.append(rule)
-            elif isinstance(next, AtKeyword):
-                self.reconsume(next)
+            elif _type is AtKeyword:
+                _reconsume()
                 rules.append(self.consume_at_rule())
             else:
-                self.reconsume(next)
+                _reconsume()
                 if (rule := self.consume_qualified_rule()) is not None:
                     rules.append(rule)
 
-    def consume_decleration(self) -> Decleration | None:
+    def consume_decleration(self, nested: bool = False) -> Decleration | None:
+        """Consume a declaration starting at its ident.
+
+        Args
+            nested (bool): Whether the declaration is inside a style block or declaration list,
+                where it ends at the next semicolon instead of the end of the tokens.
+        """
         next = self.next()
         decl = Decleration(next.raw)
-        while isinstance(self.peek(), Whitespace):
-            self.next()
+        self.skip_whitespace()
 
         if not isinstance(self.peek(), Colon):
             self.error(ParseError("Expected a colon"))
+            if nested:
+                while (peek := self.peek()) is not END_OF_FILE and type(peek) is not Semicolon:
+                    self.consume_component_value()
             return None
 
         next = self.next() 
-        while isinstance(self.peek(), Whitespace):
-            self.next()
+        self.skip_whitespace()
 
-        while not isinstance(self.peek(), EOF):
-            decl.value.append(self.consume_component_value())
-        while isinstance(decl.value[-1], Whitespace):
-            decl.value.pop()
+        append, consume, peek = decl.value.append, self.consume_component_value, self.peek
+        while (next := peek()) is not END_OF_FILE and not (nested and type(next) is Semicolon):
+            append(consume())
+        _rstrip_whitespace(decl.value)
         
-        if len(decl.value) >= 2 and isinstance(decl.value[-2], Delim) and decl.value[-2].raw == "!" and isinstance(decl.value[-1], Ident) and decl.value[-1].raw == "important":
-            decl.value.pop()
-            decl.value.pop()
+        value = decl.value
+        # Reject on the last value first, most declarations are not important
+        if (
+            len(value) >= 2
+            and type(value[-1]) is Ident
+            and value[-1].raw == "important"
+            and type(value[-2]) is Delim
+            and value[-2].raw == "!"
+        ):
+            del value[-2:]
             decl.important = True
-
-        while isinstance(decl.value[-1], Whitespace):
-            decl.value.pop()
+            _rstrip_whitespace(value)
 
         return decl
 
     def consume_style_block(self) -> list[Decleration | AtRule | QualifiedRule]:
         decls = []
         rules = []
+        _next = self.next
+        _peek = self.peek
+        _reconsume = self.reconsume
+        _consume = self.consume_component_value
         while True:
-            next = self.next()
-            if isinstance(next, (Whitespace, Semicolon)):
+            next = _next()
+            _type = type(next)
+            if _type is Whitespace or _type is Semicolon:
                 continue
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 return decls + rules
-            elif isinstance(next, AtKeyword):
-                self.reconsume(next)
+            elif _type is AtKeyword:
+                _reconsume()
                 rules.append(self.consume_at_rule())
-            elif isinstance(next, Ident):
-                temp: list = [next]
-                while not isinstance(self.peek(), (EOF, Semicolon)):
-                    temp.append(self.consume_component_value())
-                if (decl := Parse.parse_decleration(temp)) is not None:
+            elif _type is Ident:
+                _reconsume()
+                if (decl := self.consume_decleration(True)) is not None:
                     decls.append(decl)
-            elif isinstance(next, Delim) and next.raw == "&":
-                self.reconsume(next)
+            elif _type is Delim and next.raw == "&":
+                _reconsume()
                 if (qrule := self.consume_qualified_rule()) is not None:
                     rules.append(qrule)
             else:
                 self.error(ParseError("Invalid style block syntax"))
-                self.reconsume(next)
-                while not isinstance(self.peek(), (EOF, Semicolon)):
-                    self.consume_component_value()
+                _reconsume()
+                while (peek := _peek()) is not END_OF_FILE and type(peek) is not Semicolon:
+                    _consume()
 
     def consume_decl_list(self) -> list[Decleration]:
         decls = []
+        _next = self.next
+        _peek = self.peek
+        _reconsume = self.reconsume
+        _consume = self.consume_component_value
         while True:
-            next = self.next()
-            if isinstance(next, (Whitespace, Semicolon)):
+            next = _next()
+            _type = type(next)
+            if _type is Whitespace or _type is Semicolon:
                 continue
-            elif isinstance(next, EOF):
+            elif next is END_OF_FILE:
                 return decls
-            elif isinstance(next, AtKeyword):
-                self.reconsume(next)
+            elif _type is AtKeyword:
+                _reconsume()
                 decls.append(self.consume_at_rule())
-            elif isinstance(next, Ident):
-                temp: list = [next]
-                while not isinstance(self.peek(), (Semicolon, EOF)):
-                    temp.append(self.next())
-                if (decl := Parse.parse_decleration(temp)) is not None:
+            elif _type is Ident:
+                _reconsume()
+                if (decl := self.consume_decleration(True)) is not None:
                     decls.append(decl)
             else:
                 self.error(ParseError("Invalid decleration list"))
-                self.reconsume(next)
-                while not isinstance(self.peek(), (Semicolon, EOF)):
-                    self.consume_component_value()
+                _reconsume()
+                while (peek := _peek()) is not END_OF_FILE and type(peek) is not Semicolon:
+                    _consume()
+
+def _rstrip_whitespace(values: list):
+    """Remove the trailing whitespace tokens from a list of component values in place."""
+    end = len(values)
+    while end > 0 and isinstance(values[end - 1], Whitespace):
+        end -= 1
+    del values[end:]
+
+# Component values that start a block or function, any other token is returned as is
+COMPONENT_DISPATCH = {
+    LCurlyBracket: Parser.consume_block,
+    LSquareBracket: Parser.consume_block,
+    LParantheses: Parser.consume_block,
+    Function: Parser.consume_function,
+}
 
 
 if __name__ == "__main__":
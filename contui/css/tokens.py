@@ -1,3 +1,4 @@
+from sys import intern
 from typing import Literal
 
 __all__ = [
@@ -35,6 +36,7 @@ __all__ = [
 ]
 
 class Token:
+    __slots__ = ("raw",)
     raw: str 
     def __init__(self, raw: str = ''):
         self.raw = raw
@@ -45,44 +47,70 @@ class Token:
     def __str__(self) -> str:
         return self.raw
 
-class Ident(Token): pass
+# Names repeat throughout a stylesheet so they are interned to share one string each
+class Ident(Token):
+    __slots__ = ()
+    def __init__(self, raw: str = ''):
+        super().__init__(intern(raw))
 class Function(Token):
+    __slots__ = ()
+    def __init__(self, raw: str = ''):
+        super().__init__(intern(raw))
     def __str__(self) -> str:
         return f"{self.raw}("
 class AtKeyword(Token):
+    __slots__ = ()
+    def __init__(self, raw: str = ''):
+        super().__init__(intern(raw))
     def __str__(self) -> str:
         return f"@{self.raw}"
 class Hash(Token):
+    __slots__ = ("type",)
     def __init__(self, raw: str = '', *, type: Literal['id', 'unrestricted'] = 'unrestricted'):
         self.type = type
-        super().__init__(raw)
+        super().__init__(intern(raw))
     def __repr__(self) -> str:
         return f'Hash({"id, " if self.type == "id" else ""}{self.raw!r})'
     def __str__(self) -> str:
         return f"#{self.raw}"
 
 class String(Token):
+    __slots__ = ()
     def __str__(self) -> str:
         return repr(self.raw)
-class BadString(Token): pass
+class BadString(Token):
+    __slots__ = ()
 class Url(Token):
+    __slots__ = ()
     def __str__(self) -> str:
         return f"url({self.raw})"
-class BadUrl(Token): pass
+class BadUrl(Token):
+    __slots__ = ()
 
 class Delim(Token):
+    __slots__ = ()
     def __init__(self, raw: str):
         if len(raw) > 1:
             raise ValueError("Delimiters may only be one codepoint long")
-        super().__init__(raw)
+        super().__init__(intern(raw))
+    @classmethod
+    def _fast(cls, raw: str) -> "Delim":
+        """Build a delimiter from a code point the lexer already knows is valid."""
+        self = cls.__new__(cls)
+        self.raw = intern(raw)
+        return self
     def __repr__(self) -> str:
         return f'Delim({self.raw!r})'
 
-class Colon(Delim): pass
-class Semicolon(Delim): pass
-class Comma(Delim): pass
+class Colon(Delim):
+    __slots__ = ()
+class Semicolon(Delim):
+    __slots__ = ()
+class Comma(Delim):
+    __slots__ = ()
 
 class LCurlyBracket(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return RCurlyBracket
@@ -90,6 +118,7 @@ class LCurlyBracket(Token):
     def value() -> Literal['{']:
         return '{'
 class RCurlyBracket(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return LCurlyBracket
@@ -97,6 +126,7 @@ class RCurlyBracket(Token):
     def value() -> Literal['}']:
         return '}'
 class LSquareBracket(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return RSquareBracket
@@ -104,6 +134,7 @@ class LSquareBracket(Token):
     def value() -> Literal['[']:
         return '['
 class RSquareBracket(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return LSquareBracket 
@@ -111,6 +142,7 @@ class RSquareBracket(Token):
     def value() -> Literal[']']:
         return ']'
 class LParantheses(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return RParantheses
@@ -118,6 +150,7 @@ class LParantheses(Token):
     def value() -> Literal['(']:
         return '('
 class RParantheses(Token):
+    __slots__ = ()
     @property
     def alt(self) -> type:
         return LParantheses
@@ -126,9 +159,10 @@ class RParantheses(Token):
         return ')'
 
 class Number(Token):
-    value: int
+    __slots__ = ("value", "type")
+    value: int | float
     type: Literal['integer', 'number']
-    def __init__(self, value: int, type: Literal['integer', 'number'], raw: str):
+    def __init__(self, value: int | float, type: Literal['integer', 'number'], raw: str):
         self.value = value 
         self.type = type
         super().__init__(raw)
@@ -137,15 +171,17 @@ class Number(Token):
         return f"Number({self.raw!r})"
 
 class Percentage(Number):
+    __slots__ = ()
     def __repr__(self) -> str:
         return f"Percentage({self.value!r}%)"
 
     def __str__(self) -> str:
         return f"{self.raw}%"
 class Dimension(Token):
-    value: int
+    __slots__ = ("value", "type", "unit")
+    value: int | float
     type: Literal['integer', 'number']
-    def __init__(self, value: int, type: Literal['integer', 'number'], unit: str, raw: str):
+    def __init__(self, value: int | float, type: Literal['integer', 'number'], unit: str, raw: str):
         self.value = value 
         self.unit = unit
         self.type = type
@@ -158,6 +194,7 @@ class Dimension(Token):
         return f"{self.raw}"
 
 class Comment(Token):
+    __slots__ = ()
     def __init__(self, raw: str):
         super().__init__(raw)
 
@@ -165,7 +202,11 @@ class Comment(Token):
     def text(self) -> str:
         return self.raw.lstrip("/*").rstrip("*/")
 
-class Whitespace(Token): pass
-class CDO(Token): pass
-class CDC(Token): pass
-class EOF(Token): pass
+class Whitespace(Token):
+    __slots__ = ()
+class CDO(Token):
+    __slots__ = ()
+class CDC(Token):
+    __slots__ = ()
+class EOF(Token):
+    __slots__ = ()
@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from enum import Enum
-from functools import cache
+from enum import Enum, IntFlag
+from functools import cache, lru_cache
+from string import hexdigits
 from typing import Literal
 from typing_extensions import TypeAliasType
 
@@ -31,42 +32,48 @@ class Color:
 
     @staticmethod
     def new(color: ColorFormat) -> str:
-        if isinstance(color, tuple) and len(color) == 3:
+        # Named and hex colors are the most common so strings are checked first
+        if isinstance(color, str):
+            return NAMED_COLORS.get(color) or Color.hex(color)
+        elif isinstance(color, tuple) and len(color) == 3:
             return Color.rgb(*color)
         elif isinstance(color, int):
             return Color.xterm(color)
-        elif isinstance(color, str) and color in [
-            "black",
-            "red",
-            "green",
-            "yellow",
-            "blue",
-            "magenta",
-            "cyan",
-            "white",
-        ]:
-            return getattr(Color, f"{color[0].upper()}{color[1:]}")
         else:
             return Color.hex(color)
 
     @staticmethod
+    @lru_cache(maxsize=512)
     def rgb(r: int, g: int, b: int) -> str:
         return f"8;2;{r};{g};{b}"
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def xterm(code: int) -> str:
         return f"8;5;{code}"
 
     @staticmethod
+    @lru_cache(maxsize=512)
     def hex(code: str) -> str:
         code = code.lstrip("#")
-        if len(code) not in [3, 6]:
+        if len(code) not in (3, 6):
             raise Exception("Hex value must be 3 or 6 digits")
+        # int() would also accept a 0x prefix, underscores, and surrounding whitespace
+        if not HEX_DIGITS.issuperset(code):
+            raise ValueError(f"Invalid hex value {code!r}")
 
         if len(code) == 3:
             code = f"{code[0]*2}{code[1]*2}{code[2]*2}"
 
-        return f"8;2;{int(code[0:2], 16)};{int(code[2:4], 16)};{int(code[4:6], 16)}"
+        value = int(code, 16)
+        return f"8;2;{value >> 16 & 0xFF};{value >> 8 & 0xFF};{value & 0xFF}"
+
+HEX_DIGITS = frozenset(hexdigits)
+
+NAMED_COLORS = {
+    name: getattr(Color, name.capitalize())
+    for name in ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+}
 
 
 class Ansi(Enum):
@@ -104,13 +111,15 @@ class Ansi(Enum):
 
     @staticmethod
     def from_int(value: int):
-        for option in Ansi:
-            if option.value == value:
-                return option
+        if (option := ANSI_CODES.get(value)) is not None:
+            return option
         raise ValueError(f"Unexpected Ansi sequence code '{value}'")
 
-class S(Enum):
-    """Helper enum for ansi sequence styling."""
+# Member for each ansi code, aliased codes map to the first member with that code
+ANSI_CODES = {option.value: option for option in Ansi}
+
+class S(IntFlag):
+    """Helper flags for ansi sequence styling. Flags can be combined, `S.Bold | S.Italic`."""
     
     Bold = 1 << 0
     Dim = 1 << 1
@@ -129,9 +138,67 @@ class S(Enum):
     R_Reverse = 1 << 14
     R_Strike = 1 << 15
 
+# Style bit for each ansi code
+ANSI_STYLE = {code: S[option.name].value for code, option in ANSI_CODES.items()}
+# Ansi code, and the code that undoes it, for each style bit. Resetting styles undo nothing.
+STYLE_CODES = {
+    style.value: (
+        str(Ansi[style.name].value),
+        str(Ansi[f"R_{style.name}"].value) if f"R_{style.name}" in Ansi.__members__ else None,
+    )
+    for style in S
+}
+
+def _set_bits(bits: int) -> list[int]:
+    """Each set bit, lowest first. Only the set bits are visited."""
+    result = []
+    while bits:
+        lowest = bits & -bits
+        result.append(lowest)
+        bits ^= lowest
+    return result
+
+def _style_codes(bits: int) -> str:
+    return ";".join(STYLE_CODES[bit][0] for bit in _set_bits(bits))
+
+@lru_cache(maxsize=4096)
+def _ansi(bits: int, fg: str, bg: str) -> str:
+    """Ansi sequence for the packed style state, shared between equal styles."""
+    if bits == 0:
+        if fg == "" and bg == "":
+            return ""
+        # The colors carry their own leading separator
+        return f"\x1b[{fg[1:]}{bg}m" if fg != "" else f"\x1b[{bg[1:]}m"
+    return f"\x1b[{_style_codes(bits)}{fg}{bg}m"
+
+@lru_cache(maxsize=4096)
+def _reset(bits: int, fg: bool, bg: bool) -> str:
+    """Reset sequence for the packed style state, shared between equal styles."""
+    # Styles can share a reset code, bold and dim are both undone by 22
+    codes = list(dict.fromkeys(
+        reset for bit in _set_bits(bits) if (reset := STYLE_CODES[bit][1]) is not None
+    ))
+    if fg:
+        codes.append("39")
+    if bg:
+        codes.append("49")
+    if len(codes) == 0:
+        return ""
+    return f"\x1b[{';'.join(codes)}m"
+
+# Key of the default style, which has no styles or colors
+DEFAULT_KEY = (0, "", "")
+DEFAULT_HASH = hash(DEFAULT_KEY)
+
 
 class Style:
-    """Helper class to compose ansi sequence styles into a single ansi sequence."""
+    """Helper class to compose ansi sequence styles into a single ansi sequence.
+
+    Styles are treated as immutable once built, the key and hash used to compare styles and
+    the sequences are computed up front.
+    """
+
+    __slots__ = ("fg", "bg", "style", "_key", "_hash", "_ansi_", "_reset_")
 
     def __init__(
         self, *styles: S, fg: str | None = None, bg: str | None = None
@@ -142,42 +209,67 @@ class Style:
         self.style = 0
         for style in styles:
             self.style |= style.value
+        self._build_()
+
+    def _build_(self):
+        """Compute the hash and sequences from the finished style state."""
+        if self.style == 0 and self.fg == "" and self.bg == "":
+            # Default styles are by far the most common and have nothing to format
+            self._key = DEFAULT_KEY
+            self._hash = DEFAULT_HASH
+            self._ansi_ = self._reset_ = ""
+            return
+        self._key = self._key_()
+        self._hash = hash(self._key)
+        self._ansi_ = _ansi(self.style, self.fg, self.bg)
+        self._reset_ = _reset(self.style, self.fg != "", self.bg != "")
+
+    def _key_(self) -> tuple[int, str, str]:
+        """The styles, foreground, and background that identify the style. The color strings
+        are used as is so nothing outside of the style has to track them.
+        """
+        return (self.style, self.fg, self.bg)
 
     def __hash__(self) -> int:
-        return (
-            self.style | (1 if self.fg != "" else 0)
-            << 16 | (1 if self.bg != "" else 0)
-            << 17
-        )
+        return self._hash
 
     @staticmethod
     def from_ansi(sequence: str) -> Style:
+        """Parse an sgr sequence into a new style."""
+        style = Style.__new__(Style)
+        (style.style, style.fg, style.bg) = Style._parse_ansi_(sequence)
+        style._build_()
+        return style
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_ansi_(sequence: str) -> tuple[int, str, str]:
+        """The style bits, foreground, and background of an sgr sequence. Only the parsed
+        fields are cached so every call to `from_ansi` still gets its own style.
+        """
         style = Style()
-        sequence = sequence.lstrip("\x1b[").rstrip("m")
-        codes = [int(code) for code in sequence.split(";")]
+        sequence = sequence.removeprefix("\x1b[").removesuffix("m")
+        # Codes stay as the split strings, only the code being dispatched on is converted.
+        # Extended color values are copied into the sequence as they were written.
+        codes = sequence.split(";")
 
         i = 0
         while i < len(codes):
-            code = codes[i]
-            if code in Ansi.values():
-                style.style |= S[Ansi.from_int(code).name].value
+            code = int(codes[i])
+            if (bit := ANSI_STYLE.get(code)) is not None:
+                style.style |= bit
             # 30 - 37
             elif code > 29 and code < 38:
                 style.fg = f';{code}'
             # 40 - 47
             elif code > 39 and code < 48:
                 style.bg = f';{code}'
-            elif code in [38, 48]:
-                if code < 40:
-                    t = lambda val: setattr(style, "fg", f";3{val}")
-                else:
-                    t = lambda val: setattr(style, "bg", f";4{val}")
-
+            elif code == 38 or code == 48:
                 if i + 1 >= len(codes):
                     raise ValueError(
                         f"Missing special ansi color sequence type <{code};\x1b[33m<2|5>\x1b[39m"
                     )
-                next = codes[i + 1]
+                next = int(codes[i + 1])
                 i += 1
 
                 if next != 5 and next != 2:
@@ -188,58 +280,48 @@ class Style:
                 if next == 2:
                     if (missing := (i + 4) - len(codes)) > 0:
                         rgb = ["r", "g", "b"]
-                        hint = [str(v) for v in codes[i + 1 : i + 4 - missing]]
+                        hint = codes[i + 1 : i + 4 - missing]
                         hint.extend(f"\x1b[33m{v}\x1b[39m" for v in rgb[3 - missing :])
                         hint = ";".join(hint)
                         raise ValueError(
                             f"Missing special ansi color sequence rgb values <{code};2;{hint}>"
                         )
-                    rgb = codes[i + 1 : i + 4]
-                    rest = f"2;{';'.join(str(v) for v in rgb)}"
+                    values = codes[i + 1 : i + 4]
                     i += 3
                 else:
                     if i + 1 >= len(codes):
                         raise ValueError(
                             f"Missing special ansi color sequence xterm code <{code};5;\x1b[33m<code>\x1b[39m"
                         )
-                    rest = f"5;{codes[i+1]}"
+                    values = codes[i + 1 : i + 2]
                     i += 1
 
-                t(f"8;{rest}")
+                for value in values:
+                    if not value.isdecimal():
+                        raise ValueError(f"Invalid ansi color value '{value}'")
+                rest = f"{next};{';'.join(values)}"
+
+                if code == 38:
+                    style.fg = f";38;{rest}"
+                else:
+                    style.bg = f";48;{rest}"
             i += 1
-        return style
+        return (style.style, style.fg, style.bg)
 
-    @cache
     def reset(self) -> str:
-        styles = [
-            Ansi[f"{style.name}"] for style in S if self.style & style.value > 0
-        ]
-        fg, bg = "", ""
-        if self.fg != "":
-            fg += "39"
-        if self.bg != "":
-            bg += "49"
-        return f"\x1b[{';'.join([str(style.value) for style in styles])}{fg}{bg}m"
+        return self._reset_
 
-    @cache
     def ansi(self) -> str:
-        styles = [Ansi[style.name] for style in S if self.style & style.value > 0]
-        if len(styles) == 0 and self.fg == "" and self.bg == "":
-            return ""
-        return f"\x1b[{';'.join([str(style.value) for style in styles])}{self.fg}{self.bg}m"
+        return self._ansi_
 
     def __eq__(self, __value: object) -> bool:
         if isinstance(__value, Style):
-            return (
-                self.style == __value.style
-                and self.fg == __value.fg
-                and self.bg == __value.bg
-            )
+            return self._hash == __value._hash and self._key == __value._key
         return False
 
     def __repr__(self) -> str:
-        return self.reset()
+        return self._reset_
 
     def __str__(self) -> str:
-        return self.ansi()
+        return self._ansi_
 
@@ -0,0 +1,52 @@
+from os import terminal_size
+
+import pytest
+
+import contui.buffer
+from contui.buffer import Buffer, Pixel
+from contui.style import Style
+
+
+@pytest.fixture(autouse=True)
+def terminal(monkeypatch):
+    monkeypatch.setattr(contui.buffer, "get_terminal_size", lambda: terminal_size((10, 5)))
+
+
+def test_render_moves_cursor_after_empty_and_wide_symbols():
+    buffer = Buffer(4, 1, default="")
+    for j, symbol in enumerate(["a", "", "界", "b"]):
+        buffer[0][j].set(symbol)
+
+    # The empty symbol and the wide symbol don't advance the cursor one column, so the
+    # pixels after them are positioned explicitly
+    assert buffer.render() == "\x1b[1;1Ha\x1b[0m\x1b[1;3H界\x1b[0m\x1b[1;4Hb\x1b[0m"
+
+
+def test_render_runs_narrow_symbols_with_one_cursor_move():
+    buffer = Buffer(3, 1)
+    for j, symbol in enumerate("abc"):
+        buffer[0][j].set(symbol)
+
+    assert buffer.render() == "\x1b[1;1Habc\x1b[0m"
+
+
+def test_reset_redraws_changed_pixels():
+    buffer = Buffer(2, 1)
+    buffer[0][0].set("x")
+    buffer.cache()
+
+    buffer.__reset__()
+    assert buffer.render() == "\x1b[1;1H \x1b[0m"
+
+
+def test_assigned_pixels_are_rendered():
+    buffer = Buffer(2, 1)
+    buffer.cache()
+
+    buffer[0][1] = Pixel("y", Style())
+    assert buffer.render() == "\x1b[1;2Hy\x1b[0m"
+
+    # The assigned pixel keeps reporting its changes
+    buffer.cache()
+    buffer[0][1].set("z")
+    assert buffer.render() == "\x1b[1;2Hz\x1b[0m"
@@ -0,0 +1,37 @@
+from os import terminal_size
+
+import pytest
+
+import contui.buffer
+from contui import Rect, RichText, Text
+from contui.buffer import Buffer
+
+
+@pytest.fixture(autouse=True)
+def terminal(monkeypatch):
+    monkeypatch.setattr(contui.buffer, "get_terminal_size", lambda: terminal_size((10, 5)))
+
+
+def symbols(buffer: Buffer) -> list[str]:
+    return ["".join(pixel.symbol for pixel in row) for row in buffer]
+
+
+def test_rich_text_drops_trailing_line_of_only_escapes():
+    buffer = Buffer(4, 3)
+    text = RichText(style={"align_items": "end"})
+    text.text = "ab\x1b[1;44m\n\x1b[1;44m"
+
+    text.render(Rect(0, 0, 4, 3), buffer)
+    assert symbols(buffer) == ["    ", "    ", "ab  "]
+
+
+def test_text_only_splits_lines_on_newlines():
+    buffer = Buffer(4, 2)
+    Text("a\x1cb\nc").render(Rect(0, 0, 4, 2), buffer)
+    assert symbols(buffer) == ["a\x1cb ", "c   "]
+
+
+def test_rich_text_write_parses_backslash_escapes():
+    text = RichText()
+    text.write("c:\\path")
+    assert text.text == RichText("c:\\path").text